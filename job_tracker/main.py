@@ -1,104 +1,328 @@
 from fastapi import FastAPI, HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response
 from models import (
     UserRegistration, LoginRequest, LoginResponse, JobApplicationCreate,
-    JobApplicationUpdate, JobApplication, ApplicationsResponse, ApplicationStats,
+    JobApplicationUpdate, ApplicationsResponse, ApplicationStats,
     User, ApplicationStatus
 )
-from auth import get_current_user, register_user, hash_password, load_users
-import json
+from auth import get_current_user, register_user, verify_credentials
+import asyncio
+import orjson
 import os
 import logging
-from typing import List, Optional
+import threading
+from typing import Dict, List, Optional
 from datetime import datetime
+from collections import Counter
+from heapq import nlargest
+from itertools import islice
+from operator import itemgetter
 
 app = FastAPI(
     title="Job Application Tracker API",
     description="A secure API for tracking job applications with user-specific access",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-APPLICATIONS_FILE = "applications.json"
+APPLICATIONS_FILE = "applications.jsonl"
+LEGACY_APPLICATIONS_FILE = "applications.json"
+COMPACTION_THRESHOLD = 0.3  # Compact once this fraction of log lines is stale
+FSYNC_WRITES = False  # Set to True to fsync after every write (slower, more durable)
+
+# In-memory index of the append-only applications log, rebuilt on startup
+APPS: Dict[int, dict] = {}
+BY_USER: Dict[str, Dict[int, dict]] = {}  # username -> {id: application}, in insertion order
+_log_lines = 0
+_next_id = 1
+_next_id_lock = threading.Lock()
+_loaded = False  # Set once the index reflects the log; see ensure_applications_loaded
+_load_lock = threading.Lock()
+
+# Writes go through a queue drained by a single background task, so request
+# handlers never touch the log file directly
+_COMPACT = object()  # Queue marker: compact the log if enough of it is stale
+_STOP = object()  # Queue marker: flush pending writes and stop the writer
+_write_queue: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
+
+REQUIRED_FIELDS = ("id", "job_title", "company", "date_applied", "status", "username")
+_STATUS_BY_VALUE = {status.value: status for status in ApplicationStatus}
+
+def _is_valid_record(record) -> bool:
+    """Check a record read from disk once, so request handlers can trust the index"""
+    if not isinstance(record, dict) or not isinstance(record.get("id"), int):
+        return False
+    if record.get("_deleted") is True:
+        return True
+    if not all(field in record for field in REQUIRED_FIELDS):
+        return False
+    # status and username are used as dict keys during replay, so they must be strings
+    return (
+        isinstance(record["status"], str) and record["status"] in _STATUS_BY_VALUE
+        and isinstance(record["username"], str)
+    )
+
+def _parse_application(record):
+    """Convert a stored record to its in-memory form (datetime dates, enum statuses)"""
+    record["date_applied"] = datetime.fromisoformat(record["date_applied"])
+    record["status"] = _STATUS_BY_VALUE[record["status"]]
+    return record
+
+def _parse_stored_application(record):
+    """Parse a valid, non-deleted record from disk, or return None if its date can't be parsed"""
+    try:
+        return _parse_application(record)
+    except (TypeError, ValueError):
+        logger.warning("Skipping application %s with invalid date_applied", record["id"])
+        return None
+
+def _track_record_id(record):
+    """Keep _next_id past every ID seen on disk, including records that get skipped"""
+    global _next_id
+    if isinstance(record, dict) and isinstance(record.get("id"), int):
+        _next_id = max(_next_id, record["id"] + 1)
+
+def _index_application(application):
+    """Add or replace an application in the in-memory index"""
+    APPS[application["id"]] = application
+    BY_USER.setdefault(application["username"], {})[application["id"]] = application
+
+def _unindex_application(application_id: int):
+    """Remove an application from the in-memory index"""
+    application = APPS.pop(application_id, None)
+    if application is not None:
+        del BY_USER[application["username"]][application_id]
+    return application
 
 def load_applications():
-    """Load applications from JSON file with proper error handling"""
+    """Rebuild the in-memory index from the applications log"""
+    global _log_lines, _next_id, _loaded
+    APPS.clear()
+    BY_USER.clear()
+    _log_lines = 0
+    _next_id = 1
+    if not os.path.exists(APPLICATIONS_FILE):
+        if os.path.exists(LEGACY_APPLICATIONS_FILE):
+            migrate_legacy_applications()
+        _loaded = True
+        return
+    # Bad lines are skipped one by one; any other error propagates so startup fails rather
+    # than starting the writer on a partial index, where new IDs could collide with ones on disk
+    with open(APPLICATIONS_FILE, "rb") as f:
+        lines = f.read().splitlines()
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            record = None
+        _track_record_id(record)
+        if not _is_valid_record(record):
+            logger.warning("Skipping invalid record in applications file")
+            continue
+        _log_lines += 1
+        if record.get("_deleted"):
+            _unindex_application(record["id"])
+        else:
+            application = _parse_stored_application(record)
+            if application is not None:
+                _index_application(application)
+    _loaded = True
+
+def ensure_applications_loaded():
+    """Load the index on first use if startup didn't, e.g. when the app runs without its lifespan"""
+    # Without this, IDs would be handed out from 1 and appended over records already on disk
+    if not _loaded:
+        with _load_lock:
+            if not _loaded:
+                load_applications()
+
+def migrate_legacy_applications():
+    """Import applications.json into a new applications log, raising if the log can't be written"""
+    # Errors propagate so startup fails: if the writer created the log after a failed
+    # migration, applications.json would never be read again and its records would be lost
+    with open(LEGACY_APPLICATIONS_FILE, "rb") as f:
+        data = orjson.loads(f.read())
+    if not isinstance(data, list):
+        raise ValueError(f"{LEGACY_APPLICATIONS_FILE} does not contain a list of applications")
+    for record in data:
+        _track_record_id(record)
+        if not _is_valid_record(record) or record.get("_deleted"):
+            logger.warning("Skipping invalid record in %s", LEGACY_APPLICATIONS_FILE)
+            continue
+        application = _parse_stored_application(record)
+        if application is not None:
+            _index_application(application)
+    # The legacy file is only superseded once the compacted log has been swapped in
+    if not compact_applications(list(APPS.values())):
+        raise IOError(f"Could not write {APPLICATIONS_FILE}; {LEGACY_APPLICATIONS_FILE} left in place")
+    logger.info("Migrated %s applications from %s", len(APPS), LEGACY_APPLICATIONS_FILE)
+
+def _write_records(f, records):
+    """Append a batch of records to the open applications log"""
+    f.write(b"".join(orjson.dumps(record) + b"\n" for record in records))
+    f.flush()
+    if FSYNC_WRITES:
+        os.fsync(f.fileno())
+
+async def _log_writer():
+    """Background task that owns the applications log and appends queued records"""
+    global _log_lines
+    f = open(APPLICATIONS_FILE, "ab")
     try:
-        if os.path.exists(APPLICATIONS_FILE):
-            with open(APPLICATIONS_FILE, "r") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        return []
-    except (json.JSONDecodeError, IOError) as e:
-        logger.error(f"Error loading applications file: {e}")
-        return []
-    except Exception as e:
-        logger.error(f"Unexpected error loading applications file: {e}")
-        return []
+        while True:
+            # Take everything queued so far and write it in one batch
+            items = [await _write_queue.get()]
+            while not _write_queue.empty():
+                items.append(_write_queue.get_nowait())
+            
+            records = [item for item in items if isinstance(item, dict)]
+            if records:
+                try:
+                    await run_in_threadpool(_write_records, f, records)
+                    _log_lines += len(records)
+                except Exception as e:
+                    logger.error("Error saving applications file: %s", e)
+            
+            if any(item is _COMPACT for item in items) and needs_compaction():
+                f.close()
+                await run_in_threadpool(compact_applications, list(APPS.values()))
+                f = open(APPLICATIONS_FILE, "ab")
+            
+            if any(item is _STOP for item in items):
+                return
+    finally:
+        f.close()
 
-def save_applications(applications_list):
-    """Save applications to JSON file with proper error handling"""
+def _append_records(records):
+    """Append records to the applications log directly, for when the writer isn't running"""
+    global _log_lines
+    with open(APPLICATIONS_FILE, "ab") as f:
+        _write_records(f, records)
+    _log_lines += len(records)
+
+async def save_application(application):
+    """Update the index and queue a created or updated application for writing"""
+    ensure_applications_loaded()
+    _index_application(application)
+    if _writer_task is None:
+        _append_records([application])
+        return
+    await _write_queue.put(application)
+    if needs_compaction():
+        await _write_queue.put(_COMPACT)
+
+async def remove_application(application_id: int):
+    """Drop an application from the index and queue a tombstone for writing"""
+    ensure_applications_loaded()
+    application = _unindex_application(application_id)
+    if _writer_task is None:
+        _append_records([{"id": application_id, "_deleted": True}])
+        return application
+    await _write_queue.put({"id": application_id, "_deleted": True})
+    if needs_compaction():
+        await _write_queue.put(_COMPACT)
+    return application
+
+def needs_compaction() -> bool:
+    """Check whether enough of the log is stale to be worth rewriting"""
+    return _log_lines > 0 and (_log_lines - len(APPS)) / _log_lines > COMPACTION_THRESHOLD
+
+def compact_applications(applications) -> bool:
+    """Rewrite the applications log with only the given live records, returning whether it succeeded"""
+    global _log_lines
+    tmp_file = APPLICATIONS_FILE + ".tmp"
     try:
-        with open(APPLICATIONS_FILE, "w") as f:
-            json.dump(applications_list, f, indent=2, default=str)  # default=str for datetime serialization
-    except IOError as e:
-        logger.error(f"Error saving applications file: {e}")
-        raise HTTPException(status_code=500, detail="Failed to save application data")
+        with open(tmp_file, "wb") as f:
+            for application in applications:
+                f.write(orjson.dumps(application) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, APPLICATIONS_FILE)
+        _log_lines = len(applications)
+        logger.info("Compacted applications log to %s records", _log_lines)
+        return True
     except Exception as e:
-        logger.error(f"Unexpected error saving applications file: {e}")
-        raise HTTPException(status_code=500, detail="Failed to save application data")
+        logger.error("Error compacting applications file: %s", e)
+        return False
 
-def get_next_application_id():
-    """Get the next available application ID"""
-    applications = load_applications()
-    if not applications:
-        return 1
-    return max(app["id"] for app in applications) + 1
+def allocate_application_id() -> int:
+    """Reserve the next application ID"""
+    global _next_id
+    ensure_applications_loaded()
+    with _next_id_lock:
+        new_id = _next_id
+        _next_id += 1
+    return new_id
 
 def get_user_applications(username: str):
     """Get all applications for a specific user"""
-    applications = load_applications()
-    return [app for app in applications if app["username"] == username]
+    ensure_applications_loaded()
+    return list(BY_USER.get(username, {}).values())
 
 def find_application_by_id(application_id: int, username: str):
     """Find an application by ID that belongs to the specified user"""
-    applications = load_applications()
-    for app in applications:
-        if app["id"] == application_id and app["username"] == username:
-            return app
+    ensure_applications_loaded()
+    application = APPS.get(application_id)
+    if application is not None and application["username"] == username:
+        return application
     return None
 
+@app.on_event("startup")
+async def startup_event():
+    """Load the applications log into memory and start the log writer"""
+    global _write_queue, _writer_task
+    await run_in_threadpool(load_applications)
+    _write_queue = asyncio.Queue()
+    _writer_task = asyncio.create_task(_log_writer())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending application writes before exiting"""
+    if _writer_task is not None:
+        await _write_queue.put(_STOP)
+        await _writer_task
+
+# The root response never changes, so encode it once at import time
+_ROOT_BODY = orjson.dumps({
+    "message": "Welcome to Job Application Tracker API",
+    "version": "1.0.0",
+    "description": "Track your job applications securely",
+    "endpoints": {
+        "register": "POST /register/",
+        "login": "POST /login/",
+        "add_application": "POST /applications/",
+        "get_applications": "GET /applications/",
+        "update_application": "PUT /applications/{id}",
+        "delete_application": "DELETE /applications/{id}",
+        "get_stats": "GET /applications/stats/"
+    },
+    "features": [
+        "Secure user authentication",
+        "User-specific application access",
+        "Full CRUD operations for applications",
+        "Application statistics and insights"
+    ]
+})
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "message": "Welcome to Job Application Tracker API",
-        "version": "1.0.0",
-        "description": "Track your job applications securely",
-        "endpoints": {
-            "register": "POST /register/",
-            "login": "POST /login/",
-            "add_application": "POST /applications/",
-            "get_applications": "GET /applications/",
-            "update_application": "PUT /applications/{id}",
-            "delete_application": "DELETE /applications/{id}",
-            "get_stats": "GET /applications/stats/"
-        },
-        "features": [
-            "Secure user authentication",
-            "User-specific application access",
-            "Full CRUD operations for applications",
-            "Application statistics and insights"
-        ]
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 @app.post('/register/', status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserRegistration):
     """Register a new user"""
     try:
-        result = register_user(
+        result = await run_in_threadpool(
+            register_user,
             username=user_data.username,
             password=user_data.password,
             email=user_data.email,
@@ -108,7 +332,7 @@ async def register(user_data: UserRegistration):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error during registration: {e}")
+        logger.error("Error during registration: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Registration failed due to server error"
@@ -118,27 +342,16 @@ async def register(user_data: UserRegistration):
 async def login(login_data: LoginRequest):
     """Authenticate user credentials"""
     try:
-        users = load_users()
+        user_data = await run_in_threadpool(verify_credentials, login_data.username, login_data.password)
         
-        if login_data.username not in users:
-            logger.warning(f"Login attempt with non-existent username: {login_data.username}")
+        if user_data is None:
+            logger.warning("Failed login attempt for user: %s", login_data.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid username or password"
             )
         
-        user_data = users[login_data.username]
-        stored_hash = user_data["password_hash"]
-        input_hash = hash_password(login_data.password)
-        
-        if input_hash != stored_hash:
-            logger.warning(f"Failed login attempt for user: {login_data.username}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid username or password"
-            )
-        
-        logger.info(f"User {login_data.username} logged in successfully")
+        logger.info("User %s logged in successfully", login_data.username)
         
         return LoginResponse(
             message="Login successful",
@@ -149,7 +362,7 @@ async def login(login_data: LoginRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error during login: {e}")
+        logger.error("Error during login: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Login failed due to server error"
@@ -162,15 +375,13 @@ async def add_application(
 ):
     """Add a new job application (authenticated users only)"""
     try:
-        applications = load_applications()
-        
         # Create new application
         new_application = {
-            "id": get_next_application_id(),
+            "id": allocate_application_id(),
             "job_title": application_data.job_title,
             "company": application_data.company,
-            "date_applied": application_data.date_applied.isoformat(),
-            "status": application_data.status.value,
+            "date_applied": application_data.date_applied,
+            "status": application_data.status,
             "username": current_user.username,  # Automatically set to current user
             "description": application_data.description,
             "salary_range": application_data.salary_range,
@@ -178,10 +389,12 @@ async def add_application(
             "notes": application_data.notes
         }
         
-        applications.append(new_application)
-        save_applications(applications)
+        await save_application(new_application)
         
-        logger.info(f"Application for '{application_data.job_title}' at '{application_data.company}' added by user {current_user.username}")
+        logger.info(
+            "Application for '%s' at '%s' added by user %s",
+            application_data.job_title, application_data.company, current_user.username
+        )
         
         return {
             "message": "Job application added successfully",
@@ -191,7 +404,7 @@ async def add_application(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error adding application: {e}")
+        logger.error("Error adding application: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to add application due to server error"
@@ -207,55 +420,37 @@ async def get_applications(
     """Get all job applications for the current user (with optional filters)"""
     try:
         # Get only the current user's applications
-        user_applications = get_user_applications(current_user.username)
-        
-        # Apply filters if provided
-        filtered_applications = user_applications
-        
-        if status_filter:
-            filtered_applications = [
-                app for app in filtered_applications 
-                if app["status"] == status_filter.value
-            ]
+        ensure_applications_loaded()
+        user_applications = BY_USER.get(current_user.username, {}).values()
         
-        if company_filter:
-            filtered_applications = [
-                app for app in filtered_applications 
-                if company_filter.lower() in app["company"].lower()
-            ]
+        # Apply filters if provided, in a single pass
+        company_folded = company_filter.casefold() if company_filter else None
+        matches = (
+            app for app in user_applications
+            if (not status_filter or app["status"] is status_filter)
+            and (not company_folded or company_folded in app["company"].casefold())
+        )
         
-        # Apply limit if provided
+        # Apply limit if provided, stopping as soon as enough matches are found
         if limit and limit > 0:
-            filtered_applications = filtered_applications[:limit]
-        
-        # Convert to JobApplication objects
-        applications_objects = []
-        for app in filtered_applications:
-            applications_objects.append(JobApplication(
-                id=app["id"],
-                job_title=app["job_title"],
-                company=app["company"],
-                date_applied=datetime.fromisoformat(app["date_applied"]),
-                status=ApplicationStatus(app["status"]),
-                username=app["username"],
-                description=app.get("description"),
-                salary_range=app.get("salary_range"),
-                location=app.get("location"),
-                notes=app.get("notes")
-            ))
+            filtered_applications = list(islice(matches, limit))
+        else:
+            filtered_applications = list(matches)
         
-        logger.info(f"Retrieved {len(applications_objects)} applications for user {current_user.username}")
+        logger.debug("Retrieved %s applications for user %s", len(filtered_applications), current_user.username)
         
-        return ApplicationsResponse(
-            applications=applications_objects,
-            total_applications=len(applications_objects),
-            username=current_user.username
-        )
+        # Stored records are already validated, so return them directly
+        # (response_model is kept for the OpenAPI schema only)
+        return ORJSONResponse(content={
+            "applications": filtered_applications,
+            "total_applications": len(filtered_applications),
+            "username": current_user.username
+        })
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error retrieving applications for {current_user.username}: {e}")
+        logger.error("Error retrieving applications for %s: %s", current_user.username, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve applications due to server error"
@@ -269,8 +464,6 @@ async def update_application(
 ):
     """Update a job application (only the owner can update)"""
     try:
-        applications = load_applications()
-        
         # Find the application
         application = find_application_by_id(application_id, current_user.username)
         if not application:
@@ -279,45 +472,38 @@ async def update_application(
                 detail="Application not found or you don't have permission to access it"
             )
         
-        # Update the application
-        for i, app in enumerate(applications):
-            if app["id"] == application_id and app["username"] == current_user.username:
-                # Update only provided fields
-                if update_data.job_title is not None:
-                    applications[i]["job_title"] = update_data.job_title
-                if update_data.company is not None:
-                    applications[i]["company"] = update_data.company
-                if update_data.date_applied is not None:
-                    applications[i]["date_applied"] = update_data.date_applied.isoformat()
-                if update_data.status is not None:
-                    applications[i]["status"] = update_data.status.value
-                if update_data.description is not None:
-                    applications[i]["description"] = update_data.description
-                if update_data.salary_range is not None:
-                    applications[i]["salary_range"] = update_data.salary_range
-                if update_data.location is not None:
-                    applications[i]["location"] = update_data.location
-                if update_data.notes is not None:
-                    applications[i]["notes"] = update_data.notes
-                
-                save_applications(applications)
-                
-                logger.info(f"Application {application_id} updated by user {current_user.username}")
-                
-                return {
-                    "message": "Application updated successfully",
-                    "application": applications[i]
-                }
+        # Update only provided fields
+        updated_application = dict(application)
+        if update_data.job_title is not None:
+            updated_application["job_title"] = update_data.job_title
+        if update_data.company is not None:
+            updated_application["company"] = update_data.company
+        if update_data.date_applied is not None:
+            updated_application["date_applied"] = update_data.date_applied
+        if update_data.status is not None:
+            updated_application["status"] = update_data.status
+        if update_data.description is not None:
+            updated_application["description"] = update_data.description
+        if update_data.salary_range is not None:
+            updated_application["salary_range"] = update_data.salary_range
+        if update_data.location is not None:
+            updated_application["location"] = update_data.location
+        if update_data.notes is not None:
+            updated_application["notes"] = update_data.notes
         
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
+        await save_application(updated_application)
+        
+        logger.info("Application %s updated by user %s", application_id, current_user.username)
+        
+        return {
+            "message": "Application updated successfully",
+            "application": updated_application
+        }
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error updating application {application_id}: {e}")
+        logger.error("Error updating application %s: %s", application_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update application due to server error"
@@ -330,30 +516,26 @@ async def delete_application(
 ):
     """Delete a job application (only the owner can delete)"""
     try:
-        applications = load_applications()
-        
         # Find and remove the application
-        for i, app in enumerate(applications):
-            if app["id"] == application_id and app["username"] == current_user.username:
-                deleted_app = applications.pop(i)
-                save_applications(applications)
-                
-                logger.info(f"Application {application_id} deleted by user {current_user.username}")
-                
-                return {
-                    "message": "Application deleted successfully",
-                    "deleted_application": deleted_app
-                }
+        if find_application_by_id(application_id, current_user.username) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application not found or you don't have permission to delete it"
+            )
         
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found or you don't have permission to delete it"
-        )
+        deleted_app = await remove_application(application_id)
+        
+        logger.info("Application %s deleted by user %s", application_id, current_user.username)
+        
+        return {
+            "message": "Application deleted successfully",
+            "deleted_application": deleted_app
+        }
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting application {application_id}: {e}")
+        logger.error("Error deleting application %s: %s", application_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete application due to server error"
@@ -368,48 +550,31 @@ async def get_application_stats(current_user: User = Depends(get_current_user)):
         # Calculate statistics
         total_applications = len(user_applications)
         
-        # Status breakdown
-        status_breakdown = {}
-        for status in ApplicationStatus:
-            count = len([app for app in user_applications if app["status"] == status.value])
-            status_breakdown[status.value] = count
+        # Status counts and companies in a single pass
+        status_counts = Counter()
+        companies = set()
+        for app in user_applications:
+            status_counts[app["status"]] += 1
+            companies.add(app["company"])
         
-        # Companies applied to
-        companies = list(set(app["company"] for app in user_applications))
+        # Status breakdown
+        status_breakdown = {status.value: status_counts[status] for status in ApplicationStatus}
         
         # Recent applications (last 5)
-        sorted_applications = sorted(
-            user_applications,
-            key=lambda x: datetime.fromisoformat(x["date_applied"]),
-            reverse=True
-        )
-        recent_apps = []
-        for app in sorted_applications[:5]:
-            recent_apps.append(JobApplication(
-                id=app["id"],
-                job_title=app["job_title"],
-                company=app["company"],
-                date_applied=datetime.fromisoformat(app["date_applied"]),
-                status=ApplicationStatus(app["status"]),
-                username=app["username"],
-                description=app.get("description"),
-                salary_range=app.get("salary_range"),
-                location=app.get("location"),
-                notes=app.get("notes")
-            ))
+        recent_apps = nlargest(5, user_applications, key=itemgetter("date_applied"))
         
-        logger.info(f"Statistics retrieved for user {current_user.username}")
+        logger.debug("Statistics retrieved for user %s", current_user.username)
         
-        return ApplicationStats(
-            username=current_user.username,
-            total_applications=total_applications,
-            status_breakdown=status_breakdown,
-            companies_applied=companies,
-            recent_applications=recent_apps
-        )
+        return ORJSONResponse(content={
+            "username": current_user.username,
+            "total_applications": total_applications,
+            "status_breakdown": status_breakdown,
+            "companies_applied": list(companies),
+            "recent_applications": recent_apps
+        })
     
     except Exception as e:
-        logger.error(f"Error retrieving stats for {current_user.username}: {e}")
+        logger.error("Error retrieving stats for %s: %s", current_user.username, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve statistics due to server error"
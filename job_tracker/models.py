@@ -1,8 +1,37 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
+# Example payloads shown in the OpenAPI docs
+USER_REGISTRATION_EXAMPLE = {
+    "username": "john_doe",
+    "password": "secure123",
+    "email": "john@example.com",
+    "full_name": "John Doe"
+}
+
+LOGIN_REQUEST_EXAMPLE = {
+    "username": "john_doe",
+    "password": "secure123"
+}
+
+JOB_APPLICATION_CREATE_EXAMPLE = {
+    "job_title": "Senior Software Engineer",
+    "company": "Tech Corp",
+    "date_applied": "2024-01-15T10:30:00",
+    "status": "applied",
+    "description": "Full-stack development role with Python and React",
+    "salary_range": "$80,000 - $120,000",
+    "location": "San Francisco, CA",
+    "notes": "Applied through company website"
+}
+
+JOB_APPLICATION_UPDATE_EXAMPLE = {
+    "status": "interview_scheduled",
+    "notes": "Phone interview scheduled for next Tuesday"
+}
+
 class ApplicationStatus(str, Enum):
     """Job application status enumeration"""
     APPLIED = "applied"
@@ -26,28 +55,14 @@ class UserRegistration(BaseModel):
     email: Optional[str] = Field(None, description="User email")
     full_name: Optional[str] = Field(None, description="Full name")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "password": "secure123",
-                "email": "john@example.com",
-                "full_name": "John Doe"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": USER_REGISTRATION_EXAMPLE})
 
 class LoginRequest(BaseModel):
     """Model for login request"""
     username: str = Field(..., description="Username")
     password: str = Field(..., description="Password")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "password": "secure123"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": LOGIN_REQUEST_EXAMPLE})
 
 class LoginResponse(BaseModel):
     """Model for login response"""
@@ -79,19 +94,10 @@ class JobApplicationCreate(BaseModel):
     location: Optional[str] = Field(None, max_length=200, description="Job location")
     notes: Optional[str] = Field(None, max_length=1000, description="Personal notes")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "job_title": "Senior Software Engineer",
-                "company": "Tech Corp",
-                "date_applied": "2024-01-15T10:30:00",
-                "status": "applied",
-                "description": "Full-stack development role with Python and React",
-                "salary_range": "$80,000 - $120,000",
-                "location": "San Francisco, CA",
-                "notes": "Applied through company website"
-            }
-        }
+    model_config = ConfigDict(
+        json_schema_extra={"example": JOB_APPLICATION_CREATE_EXAMPLE},
+        str_strip_whitespace=True
+    )
 
 class JobApplicationUpdate(BaseModel):
     """Model for updating a job application"""
@@ -104,13 +110,10 @@ class JobApplicationUpdate(BaseModel):
     location: Optional[str] = Field(None, max_length=200)
     notes: Optional[str] = Field(None, max_length=1000)
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "status": "interview_scheduled",
-                "notes": "Phone interview scheduled for next Tuesday"
-            }
-        }
+    model_config = ConfigDict(
+        json_schema_extra={"example": JOB_APPLICATION_UPDATE_EXAMPLE},
+        str_strip_whitespace=True
+    )
 
 class ApplicationsResponse(BaseModel):
     """Model for applications list response"""
@@ -1,12 +1,20 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models import User, TokenData
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-import json
+import jwt
+from jwt.exceptions import PyJWTError as JWTError
+from passlib.context import CryptContext
+from cachetools import TTLCache
+from datetime import timedelta
+from typing import Dict, Tuple
+import orjson
+import base64
 import hashlib
+import hmac
 import os
 import logging
+import threading
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,25 +24,108 @@ logger = logging.getLogger(__name__)
 SECRET_KEY = "notes_api_secret_key_change_in_production"  # Should be in environment variables
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+# The JWT header never changes, so encode it (and the signing key) once
+_SECRET_KEY_BYTES = SECRET_KEY.encode()
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"})).rstrip(b"=")
 
 security = HTTPBearer()
 
+# bcrypt with a per-user salt; rounds tuned to keep a verify well under 500ms
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=12, deprecated="auto")
+
+# bcrypt hash of a throwaway password (same rounds as pwd_context), verified against for
+# unknown usernames so they take as long to reject as a wrong password
+DUMMY_PASSWORD_HASH = "$2b$12$K0sP7HYa2S8H2bs06hN/uu1NyiGTk1IiPTkIQUB9d/AlE0HHQTB0G"
+
+# Static salt appended to passwords by the old SHA-256 scheme
+LEGACY_SALT = b"notes_api_salt"
+
 USERS_FILE = "users.json"
 
+# Parsed users file, reused until the file's mtime/size change on disk
+_users_cache = {"stamp": None, "data": {}}
+_users_cache_lock = threading.Lock()
+
+# Serializes read-modify-write updates of users.json, which can run from threadpool workers
+_users_write_lock = threading.Lock()
+
+# Successfully verified tokens -> (username, exp epoch), so repeat requests skip jwt.decode
+TOKEN_CACHE_SWEEP_INTERVAL = 1000  # Drop expired entries every N inserts
+_token_cache: Dict[str, Tuple[str, float]] = {}
+_token_cache_lock = threading.Lock()
+_token_cache_inserts = 0
+
+# Recently verified credentials -> User, so repeat logins skip the bcrypt verify
+AUTH_CACHE_TTL_SECONDS = 60
+_auth_cache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL_SECONDS)
+_auth_cache_lock = threading.Lock()
+
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256 with salt"""
-    salt = "notes_api_salt"  # Should be random and stored securely in production
-    return hashlib.sha256((password + salt).encode()).hexdigest()
+    """Hash password using bcrypt"""
+    return pwd_context.hash(password)
+
+def legacy_hash_password(password: str) -> str:
+    """Hash password using the old SHA-256 with static salt scheme"""
+    h = hashlib.sha256(password.encode())
+    h.update(LEGACY_SALT)  # The salt is a suffix, so feed it after the password
+    return h.hexdigest()
+
+def verify_password(password: str, stored_hash: str):
+    """Verify a password, returning (is_valid, new_hash) where new_hash is set if the hash should be upgraded"""
+    if pwd_context.identify(stored_hash, required=False) is None:
+        # Legacy SHA-256 hex digest, rehash with bcrypt on successful verify
+        if not hmac.compare_digest(legacy_hash_password(password), stored_hash):
+            return False, None
+        return True, hash_password(password)
+    return pwd_context.verify_and_update(password, stored_hash)
+
+def verify_dummy_password(password: str):
+    """Spend the same bcrypt work as a real verify, so unknown usernames aren't revealed by timing"""
+    pwd_context.verify(password, DUMMY_PASSWORD_HASH)
+
+def update_password_hash(username: str, new_hash: str):
+    """Replace a user's stored password hash"""
+    with _users_write_lock:
+        users = dict(load_users())
+        users[username] = {**users[username], "password_hash": new_hash}
+        save_users(users)
+    logger.info(f"Password hash upgraded for user {username}")
+
+def _auth_cache_key(username: str, password: str):
+    """Build an auth cache key without keeping the plaintext password"""
+    return (username, hashlib.sha256(password.encode()).digest())
+
+def clear_auth_cache():
+    """Drop all cached authentications, e.g. after user data changes"""
+    with _auth_cache_lock:
+        _auth_cache.clear()
+
+def _file_stamp(path: str):
+    """Return (mtime_ns, size) for a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
 
 def load_users():
-    """Load users from JSON file with proper error handling"""
+    """Load users from JSON file, reusing the cached copy while the file is unchanged"""
     try:
-        if os.path.exists(USERS_FILE):
-            with open(USERS_FILE, "r") as f:
-                data = json.load(f)
-                return data if isinstance(data, dict) else {}
-        return {}
-    except (json.JSONDecodeError, IOError) as e:
+        with _users_cache_lock:
+            stamp = _file_stamp(USERS_FILE)
+            if stamp is None:
+                return {}
+            if stamp == _users_cache["stamp"]:
+                return _users_cache["data"]
+            with open(USERS_FILE, "rb") as f:
+                data = orjson.loads(f.read())
+            _users_cache["data"] = data if isinstance(data, dict) else {}
+            _users_cache["stamp"] = stamp
+            clear_auth_cache()
+            return _users_cache["data"]
+    except (orjson.JSONDecodeError, IOError) as e:
         logger.error(f"Error loading users file: {e}")
         return {}
     except Exception as e:
@@ -44,8 +135,15 @@ def load_users():
 def save_users(users_dict):
     """Save users to JSON file with proper error handling"""
     try:
-        with open(USERS_FILE, "w") as f:
-            json.dump(users_dict, f, indent=2)
+        with _users_cache_lock:
+            # Write to a temp file and swap it in, so a failed write never truncates users.json
+            tmp_file = USERS_FILE + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(orjson.dumps(users_dict))
+            os.replace(tmp_file, USERS_FILE)
+            _users_cache["data"] = users_dict
+            _users_cache["stamp"] = _file_stamp(USERS_FILE)
+            clear_auth_cache()
     except IOError as e:
         logger.error(f"Error saving users file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save user data")
@@ -56,17 +154,32 @@ def save_users(users_dict):
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create JWT access token"""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    expires_in = expires_delta.total_seconds() if expires_delta else ACCESS_TOKEN_EXPIRE_SECONDS
+    to_encode["exp"] = int(time.time() + expires_in)
+    signing_input = _JWT_HEADER_B64 + b"." + base64.urlsafe_b64encode(orjson.dumps(to_encode)).rstrip(b"=")
+    signature = hmac.new(_SECRET_KEY_BYTES, signing_input, hashlib.sha256).digest()
+    encoded_jwt = signing_input + b"." + base64.urlsafe_b64encode(signature).rstrip(b"=")
+    return encoded_jwt.decode()
+
+def _cache_token(token: str, username: str, exp: float):
+    """Remember a verified token until it expires, sweeping expired entries periodically"""
+    global _token_cache_inserts
+    with _token_cache_lock:
+        _token_cache[token] = (username, exp)
+        _token_cache_inserts += 1
+        if _token_cache_inserts % TOKEN_CACHE_SWEEP_INTERVAL == 0:
+            now = time.time()
+            for cached_token in [t for t, (_, e) in _token_cache.items() if e <= now]:
+                del _token_cache[cached_token]
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token and return username"""
+    token = credentials.credentials
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+    if cached is not None and time.time() < cached[1]:
+        return cached[0]
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -74,7 +187,7 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     )
     
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -87,6 +200,9 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     if token_data.username not in users:
         raise credentials_exception
     
+    # Only successful validations of expiring tokens are cached
+    if payload.get("exp") is not None:
+        _cache_token(token, token_data.username, float(payload["exp"]))
     return token_data.username
 
 def get_current_user(username: str = Depends(verify_token)) -> User:
@@ -109,30 +225,41 @@ def get_current_user(username: str = Depends(verify_token)) -> User:
 
 def authenticate_user(username: str, password: str):
     """Authenticate user with username and password"""
-    users = load_users()
+    users = load_users()  # Reloads (and clears the auth cache) if users.json changed
+    cache_key = _auth_cache_key(username, password)
+    with _auth_cache_lock:
+        cached_user = _auth_cache.get(cache_key)
+    if cached_user is not None:
+        return cached_user
     
     if username not in users:
+        verify_dummy_password(password)
         return False
     
     user_data = users[username]
     stored_hash = user_data["password_hash"]
-    input_hash = hash_password(password)
+    is_valid, new_hash = verify_password(password, stored_hash)
     
-    if input_hash != stored_hash:
+    if not is_valid:
         return False
     
-    return User(
+    if new_hash:
+        update_password_hash(username, new_hash)
+        stored_hash = new_hash
+    
+    user = User(
         username=username,
         password_hash=stored_hash,
         email=user_data.get("email"),
         full_name=user_data.get("full_name")
     )
+    with _auth_cache_lock:
+        _auth_cache[cache_key] = user
+    return user
 
 def register_user(username: str, password: str, email: str = None, full_name: str = None):
     """Register a new user"""
-    users = load_users()
-    
-    if username in users:
+    if username in load_users():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already exists"
@@ -152,15 +279,21 @@ def register_user(username: str, password: str, email: str = None, full_name: st
             detail="Password must be at least 6 characters long"
         )
     
-    # Hash password and create user
+    # Hash password outside the write lock, then create user
     hashed_password = hash_password(password)
-    users[username] = {
-        "password_hash": hashed_password,
-        "email": email,
-        "full_name": full_name
-    }
-    
-    save_users(users)
+    with _users_write_lock:
+        users = dict(load_users())  # Copy so the cached dict is only replaced once saved
+        if username in users:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already exists"
+            )
+        users[username] = {
+            "password_hash": hashed_password,
+            "email": email,
+            "full_name": full_name
+        }
+        save_users(users)
     logger.info(f"User {username} registered successfully")
     
     return {
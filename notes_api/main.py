@@ -1,22 +1,31 @@
 from fastapi import FastAPI, HTTPException, status, Depends
+from fastapi.responses import ORJSONResponse
 from models import (
     UserRegistration, LoginRequest, LoginResponse, NoteCreate, NoteUpdate,
     Note, NotesResponse, User
 )
 from auth import (
     get_current_user, register_user, authenticate_user, create_access_token,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    ACCESS_TOKEN_EXPIRE_MINUTES, ACCESS_TOKEN_EXPIRE_SECONDS
 )
-import json
+import orjson
 import os
 import logging
+import asyncio
+import heapq
+import hashlib
+import ssl
+import threading
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+from operator import itemgetter
+from fastapi.concurrency import run_in_threadpool
 
 app = FastAPI(
     title="Notes API with JWT Authentication",
     description="A secure notes management API using JWT Bearer token authentication",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure logging
@@ -25,26 +34,131 @@ logger = logging.getLogger(__name__)
 
 NOTES_FILE = "notes.json"
 
+# Parsed notes file, reused until the file's mtime/size change on disk.
+# Notes are held as {note_id: note} in file order and only turned back into a list when written.
+# "by_user" maps usernames to {note_id: note} for their notes, "search_text" maps note IDs to
+# lowercased (title, content) pairs, and "next_id" is the next free note ID; all are built when
+# the file is loaded and kept up to date by each mutation, so adds, updates and deletes are O(1).
+# Notes are replaced rather than mutated in place, so a snapshot of the values stays consistent.
+# "version" counts mutations and "dirty" is set while some are still waiting to be written to disk.
+_notes_cache = {
+    "stamp": None, "data": {}, "by_user": {}, "search_text": {}, "next_id": 1,
+    "version": 0, "dirty": False
+}
+_notes_cache_lock = threading.Lock()
+
+# Saved notes are written to disk by a background task; bursts collapse into one write
+NOTES_WRITE_DELAY_SECONDS = 0.05  # How long the writer waits for more changes before writing
+_STOP = object()  # Queue marker: flush pending writes and stop the writer
+_notes_write_queue: Optional[asyncio.Queue] = None
+_notes_writer_task: Optional[asyncio.Task] = None
+
+def _file_stamp(path: str):
+    """Return (mtime_ns, size) for a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+@app.on_event("startup")
+async def startup_event():
+    """Log which OpenSSL build backs hashlib (used for JWT HMAC-SHA256) and start the notes writer"""
+    global _notes_write_queue, _notes_writer_task
+    logger.info(f"Using {ssl.OPENSSL_VERSION}")
+    if hashlib.sha256.__name__ != "openssl_sha256":
+        logger.warning("hashlib.sha256 is not backed by OpenSSL; SHA-256 will not be hardware accelerated")
+    _notes_write_queue = asyncio.Queue()
+    _notes_writer_task = asyncio.create_task(_notes_writer())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending notes writes before exiting"""
+    global _notes_writer_task
+    if _notes_writer_task is not None:
+        _notes_write_queue.put_nowait(_STOP)
+        await _notes_writer_task
+        _notes_writer_task = None
+
+def _index_note(note):
+    """Add or replace a note in the cached notes and their indexes"""
+    _notes_cache["data"][note["id"]] = note
+    _notes_cache["by_user"].setdefault(note["username"], {})[note["id"]] = note
+    _notes_cache["search_text"][note["id"]] = (note["title"].lower(), note["content"].lower())
+
 def load_notes():
-    """Load notes from JSON file with proper error handling"""
+    """Load notes from JSON file as {note_id: note}, reusing the cached copy while the file is unchanged"""
     try:
-        if os.path.exists(NOTES_FILE):
-            with open(NOTES_FILE, "r") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        return []
-    except (json.JSONDecodeError, IOError) as e:
+        with _notes_cache_lock:
+            if _notes_cache["dirty"]:
+                return _notes_cache["data"]  # Unwritten changes are newer than the file
+            stamp = _file_stamp(NOTES_FILE)
+            if stamp is None:
+                return {}
+            if stamp == _notes_cache["stamp"]:
+                return _notes_cache["data"]
+            with open(NOTES_FILE, "rb") as f:
+                data = orjson.loads(f.read())
+            _notes_cache["data"] = {}
+            _notes_cache["by_user"] = {}
+            _notes_cache["search_text"] = {}
+            for note in data if isinstance(data, list) else []:
+                _index_note(note)
+            _notes_cache["next_id"] = max(_notes_cache["data"], default=0) + 1
+            _notes_cache["stamp"] = stamp
+            return _notes_cache["data"]
+    except (orjson.JSONDecodeError, IOError) as e:
         logger.error(f"Error loading notes file: {e}")
-        return []
+        return {}
     except Exception as e:
         logger.error(f"Unexpected error loading notes file: {e}")
-        return []
+        return {}
+
+def write_notes_file():
+    """Atomically replace the notes file with the current notes"""
+    # Written to a fresh file and swapped in rather than rewritten in place through a
+    # long-lived descriptor, so a failed write never leaves notes.json truncated.
+    # This only runs once per coalesced background write, and reads only reopen
+    # the file when its mtime/size change.
+    with _notes_cache_lock:
+        notes_list = list(_notes_cache["data"].values())
+        version = _notes_cache["version"]
+    tmp_file = NOTES_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(orjson.dumps(notes_list))
+    os.replace(tmp_file, NOTES_FILE)
+    with _notes_cache_lock:
+        _notes_cache["stamp"] = _file_stamp(NOTES_FILE)
+        if _notes_cache["version"] == version:
+            _notes_cache["dirty"] = False
+
+async def _notes_writer():
+    """Background task that writes the notes to disk after they change"""
+    stopping = False
+    while not stopping:
+        items = [await _notes_write_queue.get()]
+        if items[0] is not _STOP:
+            await asyncio.sleep(NOTES_WRITE_DELAY_SECONDS)
+        while not _notes_write_queue.empty():
+            items.append(_notes_write_queue.get_nowait())
+        
+        stopping = any(item is _STOP for item in items)
+        with _notes_cache_lock:
+            dirty = _notes_cache["dirty"]
+        if dirty:
+            # One write covers every change queued so far
+            try:
+                await run_in_threadpool(write_notes_file)
+            except Exception as e:
+                logger.error(f"Error saving notes file: {e}")
 
-def save_notes(notes_list):
-    """Save notes to JSON file with proper error handling"""
+def save_notes():
+    """Queue the changed notes for writing, or write them directly if the writer isn't running"""
+    if _notes_writer_task is not None:
+        _notes_write_queue.put_nowait(True)
+        return
     try:
-        with open(NOTES_FILE, "w") as f:
-            json.dump(notes_list, f, indent=2, default=str)  # default=str for datetime serialization
+        write_notes_file()
     except IOError as e:
         logger.error(f"Error saving notes file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save notes data")
@@ -52,24 +166,64 @@ def save_notes(notes_list):
         logger.error(f"Unexpected error saving notes file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save notes data")
 
-def get_next_note_id():
-    """Get the next available note ID"""
-    notes = load_notes()
-    if not notes:
-        return 1
-    return max(note["id"] for note in notes) + 1
+def _mark_notes_changed():
+    """Record a mutation of the cached notes; call with _notes_cache_lock held"""
+    _notes_cache["version"] += 1
+    _notes_cache["dirty"] = True
+
+def create_note(title: str, content: str, username: str):
+    """Add a note with the next free ID and save it"""
+    load_notes()  # Picks up outside edits to notes.json before the ID is chosen
+    with _notes_cache_lock:
+        note = {
+            "id": _notes_cache["next_id"],
+            "title": title,
+            "content": content,
+            "date": datetime.utcnow().isoformat(),
+            "username": username
+        }
+        _notes_cache["next_id"] += 1
+        _index_note(note)
+        _mark_notes_changed()
+    save_notes()
+    return note
+
+def replace_note(note):
+    """Store an updated copy of an existing note and save it"""
+    with _notes_cache_lock:
+        _index_note(note)
+        _mark_notes_changed()
+    save_notes()
+
+def remove_note(note_id: int):
+    """Delete a note and save, returning the deleted note"""
+    with _notes_cache_lock:
+        note = _notes_cache["data"].pop(note_id)
+        user_notes = _notes_cache["by_user"][note["username"]]
+        del user_notes[note_id]
+        if not user_notes:
+            del _notes_cache["by_user"][note["username"]]
+        del _notes_cache["search_text"][note_id]
+        _mark_notes_changed()
+    save_notes()
+    return note
 
 def get_user_notes(username: str):
-    """Get all notes for a specific user"""
-    notes = load_notes()
-    return [note for note in notes if note["username"] == username]
+    """Get {note_id: note} for the notes of a specific user"""
+    load_notes()
+    with _notes_cache_lock:
+        return _notes_cache["by_user"].get(username, {})
+
+def get_notes_search_text():
+    """Return {note_id: (lowercased title, lowercased content)} for the cached notes"""
+    with _notes_cache_lock:
+        return _notes_cache["search_text"]
 
 def find_note_by_id(note_id: int, username: str):
     """Find a note by ID that belongs to the specified user"""
-    notes = load_notes()
-    for note in notes:
-        if note["id"] == note_id and note["username"] == username:
-            return note
+    note = load_notes().get(note_id)
+    if note is not None and note["username"] == username:
+        return note
     return None
 
 @app.get("/")
@@ -98,7 +252,9 @@ async def root():
 async def register(user_data: UserRegistration):
     """Register a new user"""
     try:
-        result = register_user(
+        # bcrypt releases the GIL, so concurrent registrations and logins hash in parallel
+        result = await run_in_threadpool(
+            register_user,
             username=user_data.username,
             password=user_data.password,
             email=user_data.email,
@@ -119,7 +275,7 @@ async def login(login_data: LoginRequest):
     """Authenticate user and return JWT token"""
     try:
         # Authenticate user
-        user = authenticate_user(login_data.username, login_data.password)
+        user = await run_in_threadpool(authenticate_user, login_data.username, login_data.password)
         if not user:
             logger.warning(f"Failed login attempt for user: {login_data.username}")
             raise HTTPException(
@@ -128,11 +284,8 @@ async def login(login_data: LoginRequest):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Create access token
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.username}, expires_delta=access_token_expires
-        )
+        # Create access token (expires after ACCESS_TOKEN_EXPIRE_MINUTES)
+        access_token = create_access_token(data={"sub": user.username})
         
         logger.info(f"User {login_data.username} logged in successfully")
         
@@ -140,7 +293,7 @@ async def login(login_data: LoginRequest):
             access_token=access_token,
             token_type="bearer",
             username=user.username,
-            expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60  # Convert to seconds
+            expires_in=ACCESS_TOKEN_EXPIRE_SECONDS
         )
     
     except HTTPException:
@@ -159,19 +312,8 @@ async def add_note(
 ):
     """Add a new note (requires JWT token)"""
     try:
-        notes = load_notes()
-        
-        # Create new note
-        new_note = {
-            "id": get_next_note_id(),
-            "title": note_data.title,
-            "content": note_data.content,
-            "date": datetime.utcnow().isoformat(),
-            "username": current_user.username  # Automatically set to current user
-        }
-        
-        notes.append(new_note)
-        save_notes(notes)
+        # Create new note, owned by the current user
+        new_note = create_note(note_data.title, note_data.content, current_user.username)
         
         logger.info(f"Note '{note_data.title}' added by user {current_user.username}")
         
@@ -197,42 +339,35 @@ async def get_notes(
 ):
     """Get all notes for the current user (requires JWT token)"""
     try:
-        # Get only the current user's notes
+        # Get only the current user's notes, applying the search filter in the same pass
         user_notes = get_user_notes(current_user.username)
-        
-        # Apply search filter if provided
         if search:
             search_lower = search.lower()
-            user_notes = [
-                note for note in user_notes 
-                if search_lower in note["title"].lower() or search_lower in note["content"].lower()
-            ]
-        
-        # Sort by date (newest first)
-        user_notes.sort(key=lambda x: datetime.fromisoformat(x["date"]), reverse=True)
+            search_text = get_notes_search_text()
+            matches = (
+                note for note_id, note in user_notes.items()
+                if search_lower in search_text[note_id][0] or search_lower in search_text[note_id][1]
+            )
+        else:
+            matches = user_notes.values()
         
-        # Apply limit if provided
+        # Sort by date (newest first), keeping only the top `limit` notes when given.
+        # ISO 8601 strings sort chronologically, so dates don't need parsing here.
+        date_key = itemgetter("date")
         if limit and limit > 0:
-            user_notes = user_notes[:limit]
-        
-        # Convert to Note objects
-        notes_objects = []
-        for note in user_notes:
-            notes_objects.append(Note(
-                id=note["id"],
-                title=note["title"],
-                content=note["content"],
-                date=datetime.fromisoformat(note["date"]),
-                username=note["username"]
-            ))
+            user_notes = heapq.nlargest(limit, matches, key=date_key)
+        else:
+            user_notes = sorted(matches, key=date_key, reverse=True)
         
-        logger.info(f"Retrieved {len(notes_objects)} notes for user {current_user.username}")
+        logger.info(f"Retrieved {len(user_notes)} notes for user {current_user.username}")
         
-        return NotesResponse(
-            notes=notes_objects,
-            total_notes=len(notes_objects),
-            username=current_user.username
-        )
+        # Stored notes are already validated, so return them directly
+        # (response_model is kept for the OpenAPI schema only)
+        return ORJSONResponse(content={
+            "notes": user_notes,
+            "total_notes": len(user_notes),
+            "username": current_user.username
+        })
     
     except HTTPException:
         raise
@@ -251,41 +386,32 @@ async def update_note(
 ):
     """Update a note (requires JWT token, only owner can update)"""
     try:
-        notes = load_notes()
-        
         # Find the note
         note = find_note_by_id(note_id, current_user.username)
-        if not note:
+        if note is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Note not found or you don't have permission to access it"
             )
         
-        # Update the note
-        for i, note in enumerate(notes):
-            if note["id"] == note_id and note["username"] == current_user.username:
-                # Update only provided fields
-                if update_data.title is not None:
-                    notes[i]["title"] = update_data.title
-                if update_data.content is not None:
-                    notes[i]["content"] = update_data.content
-                
-                # Update the date to current time
-                notes[i]["date"] = datetime.utcnow().isoformat()
-                
-                save_notes(notes)
-                
-                logger.info(f"Note {note_id} updated by user {current_user.username}")
-                
-                return {
-                    "message": "Note updated successfully",
-                    "note": notes[i]
-                }
+        # Update only provided fields, on a copy so the stored note is replaced rather than mutated
+        note = dict(note)
+        if update_data.title is not None:
+            note["title"] = update_data.title
+        if update_data.content is not None:
+            note["content"] = update_data.content
         
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Note not found"
-        )
+        # Update the date to current time
+        note["date"] = datetime.utcnow().isoformat()
+        
+        replace_note(note)
+        
+        logger.info(f"Note {note_id} updated by user {current_user.username}")
+        
+        return {
+            "message": "Note updated successfully",
+            "note": note
+        }
     
     except HTTPException:
         raise
@@ -303,25 +429,22 @@ async def delete_note(
 ):
     """Delete a note (requires JWT token, only owner can delete)"""
     try:
-        notes = load_notes()
+        # Find the note
+        if find_note_by_id(note_id, current_user.username) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Note not found or you don't have permission to delete it"
+            )
         
-        # Find and remove the note
-        for i, note in enumerate(notes):
-            if note["id"] == note_id and note["username"] == current_user.username:
-                deleted_note = notes.pop(i)
-                save_notes(notes)
-                
-                logger.info(f"Note {note_id} deleted by user {current_user.username}")
-                
-                return {
-                    "message": "Note deleted successfully",
-                    "deleted_note": deleted_note
-                }
+        # Remove the note
+        deleted_note = remove_note(note_id)
         
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Note not found or you don't have permission to delete it"
-        )
+        logger.info(f"Note {note_id} deleted by user {current_user.username}")
+        
+        return {
+            "message": "Note deleted successfully",
+            "deleted_note": deleted_note
+        }
     
     except HTTPException:
         raise
@@ -332,7 +455,7 @@ async def delete_note(
             detail="Failed to delete note due to server error"
         )
 
-@app.get('/notes/{note_id}')
+@app.get('/notes/{note_id}', response_model=Note)
 async def get_note(
     note_id: int,
     current_user: User = Depends(get_current_user)
@@ -346,18 +469,10 @@ async def get_note(
                 detail="Note not found or you don't have permission to access it"
             )
         
-        # Convert to Note object
-        note_object = Note(
-            id=note["id"],
-            title=note["title"],
-            content=note["content"],
-            date=datetime.fromisoformat(note["date"]),
-            username=note["username"]
-        )
-        
         logger.info(f"Note {note_id} retrieved by user {current_user.username}")
         
-        return note_object
+        # Stored notes are already validated, so return it directly
+        return ORJSONResponse(content=note)
     
     except HTTPException:
         raise
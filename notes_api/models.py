@@ -1,7 +1,30 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
+# Example payloads shown in the OpenAPI docs
+USER_REGISTRATION_EXAMPLE = {
+    "username": "john_doe",
+    "password": "secure123",
+    "email": "john@example.com",
+    "full_name": "John Doe"
+}
+
+LOGIN_REQUEST_EXAMPLE = {
+    "username": "john_doe",
+    "password": "secure123"
+}
+
+NOTE_CREATE_EXAMPLE = {
+    "title": "Meeting Notes",
+    "content": "Discussed project timeline and deliverables. Next meeting scheduled for Friday."
+}
+
+NOTE_UPDATE_EXAMPLE = {
+    "title": "Updated Meeting Notes",
+    "content": "Updated content with action items and deadlines."
+}
+
 class User(BaseModel):
     """User model for authentication"""
     username: str
@@ -16,28 +39,14 @@ class UserRegistration(BaseModel):
     email: Optional[str] = Field(None, description="User email")
     full_name: Optional[str] = Field(None, description="Full name")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "password": "secure123",
-                "email": "john@example.com",
-                "full_name": "John Doe"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": USER_REGISTRATION_EXAMPLE})
 
 class LoginRequest(BaseModel):
     """Model for login request"""
     username: str = Field(..., description="Username")
     password: str = Field(..., description="Password")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "password": "secure123"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": LOGIN_REQUEST_EXAMPLE})
 
 class LoginResponse(BaseModel):
     """Model for login response with JWT token"""
@@ -59,26 +68,14 @@ class NoteCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=200, description="Note title")
     content: str = Field(..., min_length=1, description="Note content")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "title": "Meeting Notes",
-                "content": "Discussed project timeline and deliverables. Next meeting scheduled for Friday."
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": NOTE_CREATE_EXAMPLE})
 
 class NoteUpdate(BaseModel):
     """Model for updating a note"""
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     content: Optional[str] = Field(None, min_length=1)
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "title": "Updated Meeting Notes",
-                "content": "Updated content with action items and deadlines."
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": NOTE_UPDATE_EXAMPLE})
 
 class NotesResponse(BaseModel):
     """Model for notes list response"""
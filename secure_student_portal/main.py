@@ -1,10 +1,17 @@
 from fastapi import FastAPI, HTTPException, status, Depends
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+from cachetools import TTLCache
 from models import Student, StudentRegistration, LoginRequest, LoginResponse, GradesResponse
-import json
+import orjson
 import hashlib
+import hmac
 import os
 import logging
+import asyncio
+import threading
+from typing import Optional
 
 app = FastAPI(
     title="Secure Student Portal API",
@@ -14,32 +21,145 @@ app = FastAPI(
 
 security = HTTPBasic()
 
+# bcrypt with a per-user salt; rounds tuned to keep a verify well under 500ms
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=12, deprecated="auto")
+
+# bcrypt hash of a throwaway password (same rounds as pwd_context), verified against for
+# unknown usernames so they take as long to reject as a wrong password
+DUMMY_PASSWORD_HASH = "$2b$12$K0sP7HYa2S8H2bs06hN/uu1NyiGTk1IiPTkIQUB9d/AlE0HHQTB0G"
+
+# Static salt appended to passwords by the old SHA-256 scheme
+LEGACY_SALT = b"secure_student_portal_salt"
+
 STUDENTS_FILE = "students.json"
 
+# Parsed students file, reused until the file's mtime/size change on disk.
+# "dirty" is set while saved students are still waiting to be written to disk.
+_students_cache = {"stamp": None, "data": {}, "dirty": False}
+_students_cache_lock = threading.Lock()
+
+# Serializes read-modify-write updates of students.json, which can run from threadpool workers
+_students_write_lock = threading.Lock()
+
+# Recently verified credentials, so repeat Basic Auth requests skip the bcrypt verify
+AUTH_CACHE_TTL_SECONDS = 60
+_auth_cache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL_SECONDS)
+_auth_cache_lock = threading.Lock()
+
+# Saved students snapshots are written to disk by a background task; bursts collapse into one write
+STUDENTS_WRITE_DELAY_SECONDS = 0.05  # How long the writer waits for more snapshots before writing
+_STOP = object()  # Queue marker: flush pending writes and stop the writer
+_students_write_queue: Optional[asyncio.Queue] = None
+_students_writer_task: Optional[asyncio.Task] = None
+_students_writer_loop: Optional[asyncio.AbstractEventLoop] = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _file_stamp(path: str):
+    """Return (mtime_ns, size) for a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _auth_cache_key(username: str, password: str):
+    """Build an auth cache key without keeping the plaintext password"""
+    return (username, hashlib.sha256(password.encode()).digest())
+
+def clear_auth_cache():
+    """Drop all cached authentications, e.g. after student data changes"""
+    with _auth_cache_lock:
+        _auth_cache.clear()
+
+@app.on_event("startup")
+async def startup_event():
+    """Warm the students cache and start the students writer"""
+    global _students_write_queue, _students_writer_task, _students_writer_loop
+    await run_in_threadpool(load_students)
+    _students_writer_loop = asyncio.get_running_loop()
+    _students_write_queue = asyncio.Queue()
+    _students_writer_task = asyncio.create_task(_students_writer())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending students writes before exiting"""
+    global _students_writer_task
+    if _students_writer_task is not None:
+        _students_write_queue.put_nowait(_STOP)
+        await _students_writer_task
+        _students_writer_task = None
+
+# Called directly from async handlers: once the cache is warm, a call is one os.stat, cheaper
+# than a threadpool hop. The file is only parsed again if it is edited outside the app.
 def load_students():
-    """Load students from JSON file with proper error handling"""
+    """Load students from JSON file, reusing the cached copy while the file is unchanged"""
     try:
-        if os.path.exists(STUDENTS_FILE):
-            with open(STUDENTS_FILE, "r") as f:
-                data = json.load(f)
-                return data if isinstance(data, dict) else {}
-        return {}
-    except (json.JSONDecodeError, IOError) as e:
+        with _students_cache_lock:
+            if _students_cache["dirty"]:
+                return _students_cache["data"]  # Unwritten changes are newer than the file
+            stamp = _file_stamp(STUDENTS_FILE)
+            if stamp is None:
+                return {}
+            if stamp == _students_cache["stamp"]:
+                return _students_cache["data"]
+            with open(STUDENTS_FILE, "rb") as f:
+                data = orjson.loads(f.read())
+            _students_cache["data"] = data if isinstance(data, dict) else {}
+            _students_cache["stamp"] = stamp
+            clear_auth_cache()
+            return _students_cache["data"]
+    except (orjson.JSONDecodeError, IOError) as e:
         logger.error(f"Error loading students file: {e}")
         return {}
     except Exception as e:
         logger.error(f"Unexpected error loading students file: {e}")
         return {}
 
+def write_students_file(students_dict):
+    """Atomically replace the students file with the given students"""
+    tmp_file = STUDENTS_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(orjson.dumps(students_dict))
+    os.replace(tmp_file, STUDENTS_FILE)
+    with _students_cache_lock:
+        _students_cache["stamp"] = _file_stamp(STUDENTS_FILE)
+        if _students_cache["data"] is students_dict:
+            _students_cache["dirty"] = False
+
+async def _students_writer():
+    """Background task that writes the latest queued students snapshot to disk"""
+    stopping = False
+    while not stopping:
+        items = [await _students_write_queue.get()]
+        if items[0] is not _STOP:
+            await asyncio.sleep(STUDENTS_WRITE_DELAY_SECONDS)
+        while not _students_write_queue.empty():
+            items.append(_students_write_queue.get_nowait())
+        
+        stopping = any(item is _STOP for item in items)
+        snapshots = [item for item in items if item is not _STOP]
+        if snapshots:
+            # Only the newest snapshot matters, older ones are superseded
+            try:
+                await run_in_threadpool(write_students_file, snapshots[-1])
+            except Exception as e:
+                logger.error(f"Error saving students file: {e}")
+
 def save_students(students_dict):
-    """Save students to JSON file with proper error handling"""
+    """Save students in memory and queue them for writing, or write directly if the writer isn't running"""
+    with _students_cache_lock:
+        _students_cache["data"] = students_dict
+        _students_cache["dirty"] = True
+        clear_auth_cache()
+    if _students_writer_task is not None:
+        # Saves also happen in threadpool workers (e.g. hash upgrades during auth), so hand off via the loop
+        _students_writer_loop.call_soon_threadsafe(_students_write_queue.put_nowait, students_dict)
+        return
     try:
-        with open(STUDENTS_FILE, "w") as f:
-            json.dump(students_dict, f, indent=2)
+        write_students_file(students_dict)
     except IOError as e:
         logger.error(f"Error saving students file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save student data")
@@ -48,15 +168,66 @@ def save_students(students_dict):
         raise HTTPException(status_code=500, detail="Failed to save student data")
 
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256 with salt"""
-    salt = "secure_student_portal_salt"
-    return hashlib.sha256((password + salt).encode()).hexdigest()
+    """Hash password using bcrypt"""
+    return pwd_context.hash(password)
+
+def legacy_hash_password(password: str) -> str:
+    """Hash password using the old SHA-256 with static salt scheme"""
+    h = hashlib.sha256(password.encode())
+    h.update(LEGACY_SALT)  # The salt is a suffix, so feed it after the password
+    return h.hexdigest()
+
+def verify_password(password: str, stored_hash: str):
+    """Verify a password, returning (is_valid, new_hash) where new_hash is set if the hash should be upgraded"""
+    if pwd_context.identify(stored_hash, required=False) is None:
+        # Legacy SHA-256 hex digest, rehash with bcrypt on successful verify
+        if not hmac.compare_digest(legacy_hash_password(password), stored_hash):
+            return False, None
+        return True, hash_password(password)
+    return pwd_context.verify_and_update(password, stored_hash)
+
+def verify_dummy_password(password: str):
+    """Spend the same bcrypt work as a real verify, so unknown usernames aren't revealed by timing"""
+    pwd_context.verify(password, DUMMY_PASSWORD_HASH)
+
+def update_password_hash(username: str, new_hash: str):
+    """Replace a student's stored password hash"""
+    with _students_write_lock:
+        students_dict = dict(load_students())
+        students_dict[username] = {**students_dict[username], "password_hash": new_hash}
+        save_students(students_dict)
+    logger.info(f"Password hash upgraded for user {username}")
+
+def add_student(username: str, hashed_password: str, grades):
+    """Add a student record, failing if the username was taken meanwhile"""
+    with _students_write_lock:
+        # Load existing students (copied so the cache is only replaced once saved)
+        students_dict = dict(load_students())
+        if username in students_dict:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, 
+                detail="Username already exists"
+            )
+        
+        # Create student record
+        students_dict[username] = {
+            'password_hash': hashed_password,
+            'grades': grades
+        }
+        
+        # Save to file
+        save_students(students_dict)
 
 def get_current_username(credentials: HTTPBasicCredentials = Depends(security)):
     """Authenticate user using HTTP Basic Auth"""
-    students = load_students()
+    students = load_students()  # Reloads (and clears the auth cache) if students.json changed
+    cache_key = _auth_cache_key(credentials.username, credentials.password)
+    with _auth_cache_lock:
+        if cache_key in _auth_cache:
+            return credentials.username
     
     if credentials.username not in students:
+        verify_dummy_password(credentials.password)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -64,15 +235,20 @@ def get_current_username(credentials: HTTPBasicCredentials = Depends(security)):
         )
 
     stored_hash = students[credentials.username]["password_hash"]
-    input_hash = hash_password(credentials.password)
+    is_valid, new_hash = verify_password(credentials.password, stored_hash)
 
-    if input_hash != stored_hash:
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Basic"}
         )
     
+    if new_hash:
+        update_password_hash(credentials.username, new_hash)
+    
+    with _auth_cache_lock:
+        _auth_cache[cache_key] = True
     return credentials.username
 
 @app.get("/")
@@ -92,11 +268,8 @@ async def root():
 async def register(student_data: StudentRegistration):
     """Register a new student with proper validation and security"""
     try:
-        # Load existing students
-        students_dict = load_students()
-        
         # Check if username already exists
-        if student_data.username in students_dict:
+        if student_data.username in load_students():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, 
                 detail="Username already exists"
@@ -116,17 +289,13 @@ async def register(student_data: StudentRegistration):
                 detail="Password must be at least 6 characters long"
             )
         
-        # Hash the password
-        hashed_password = hash_password(student_data.password)
+        # Hash the password (in the threadpool, so concurrent requests hash in parallel)
+        hashed_password = await run_in_threadpool(hash_password, student_data.password)
         
-        # Create student record
-        students_dict[student_data.username] = {
-            'password_hash': hashed_password,
-            'grades': student_data.grades
-        }
-        
-        # Save to file
-        save_students(students_dict)
+        # Save in the threadpool too, since the write lock may be held by a Basic Auth request
+        await run_in_threadpool(
+            add_student, student_data.username, hashed_password, student_data.grades
+        )
         
         logger.info(f"Student {student_data.username} registered successfully")
         
@@ -153,23 +322,27 @@ async def login(login_data: LoginRequest):
         
         # Check if user exists
         if login_data.username not in students_dict:
+            await run_in_threadpool(verify_dummy_password, login_data.password)
             logger.warning(f"Login attempt with non-existent username: {login_data.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid username or password"
             )
         
-        # Verify password using the same hashing function as registration
+        # Verify password against the stored hash
         stored_hash = students_dict[login_data.username]["password_hash"]
-        input_hash = hash_password(login_data.password)
+        is_valid, new_hash = await run_in_threadpool(verify_password, login_data.password, stored_hash)
         
-        if input_hash != stored_hash:
+        if not is_valid:
             logger.warning(f"Failed login attempt for user: {login_data.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid username or password"
             )
         
+        if new_hash:
+            await run_in_threadpool(update_password_hash, login_data.username, new_hash)
+        
         logger.info(f"User {login_data.username} logged in successfully")
         
         return LoginResponse(
@@ -1,39 +1,44 @@
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+
+# Example payloads shown in the OpenAPI docs
+STUDENT_REGISTRATION_EXAMPLE = {
+    "username": "john_doe",
+    "password": "secure123",
+    "grades": [85.5, 92.0, 78.5]
+}
+
+LOGIN_REQUEST_EXAMPLE = {
+    "username": "john_doe",
+    "password": "secure123"
+}
+
+GRADES_RESPONSE_EXAMPLE = {
+    "username": "john_doe",
+    "grades": [85.5, 92.0, 78.5],
+    "average_grade": 85.33
+}
 
 class Student(BaseModel):
     """Model for student data stored in database"""
     username: str
     password_hash: str
-    grades: List[float] = []
+    grades: List[float] = Field(default_factory=list)
 
 class StudentRegistration(BaseModel):
     """Model for student registration request"""
     username: str = Field(..., min_length=3, max_length=50, description="Username for the student")
     password: str = Field(..., min_length=6, description="Plain text password (will be hashed)")
-    grades: List[float] = Field(default=[], description="Initial grades (optional)")
+    grades: List[float] = Field(default_factory=list, description="Initial grades (optional)")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "password": "secure123",
-                "grades": [85.5, 92.0, 78.5]
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": STUDENT_REGISTRATION_EXAMPLE})
 
 class LoginRequest(BaseModel):
     """Model for login request"""
     username: str = Field(..., description="Username")
     password: str = Field(..., description="Password")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "password": "secure123"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": LOGIN_REQUEST_EXAMPLE})
 
 class LoginResponse(BaseModel):
     """Model for login response"""
@@ -44,13 +49,6 @@ class GradesResponse(BaseModel):
     """Model for grades response"""
     username: str
     grades: List[float]
-    average_grade: float = None
+    average_grade: Optional[float] = None
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "grades": [85.5, 92.0, 78.5],
-                "average_grade": 85.33
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": GRADES_RESPONSE_EXAMPLE})
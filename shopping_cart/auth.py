@@ -1,10 +1,15 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from models import User, UserRole
-import json
+from passlib.context import CryptContext
+from cachetools import TTLCache
+import orjson
 import hashlib
+import hmac
 import os
 import logging
+import threading
+from typing import Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,22 +17,96 @@ logger = logging.getLogger(__name__)
 
 security = HTTPBasic()
 
+# bcrypt with a per-user salt; rounds tuned to keep a verify well under 500ms
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=12, deprecated="auto")
+
+# bcrypt hash of a throwaway password (same rounds as pwd_context), verified against for
+# unknown usernames so they take as long to reject as a wrong password
+DUMMY_PASSWORD_HASH = "$2b$12$K0sP7HYa2S8H2bs06hN/uu1NyiGTk1IiPTkIQUB9d/AlE0HHQTB0G"
+
+# Static salt appended to passwords by the old SHA-256 scheme
+LEGACY_SALT = b"shopping_cart_salt"
+
 USERS_FILE = "users.json"
 
+# Parsed users file, reused until the file's mtime/size change on disk.
+# "models" holds a (users dict, {username: User}) pair filled in per user on first use, valid
+# while that users dict is still the cached "data".
+_users_cache = {"stamp": None, "data": {}, "models": None}
+_users_cache_lock = threading.Lock()
+
+# Recently verified credentials and their User, so repeat Basic Auth requests skip the bcrypt verify
+AUTH_CACHE_TTL_SECONDS = 60
+_auth_cache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL_SECONDS)
+_auth_cache_lock = threading.Lock()
+
+# Serializes read-modify-write updates of users.json, which can run from threadpool workers
+_users_write_lock = threading.Lock()
+
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256 with salt"""
-    salt = "shopping_cart_salt"  # Should be random and stored securely in production
-    return hashlib.sha256((password + salt).encode()).hexdigest()
+    """Hash password using bcrypt"""
+    return pwd_context.hash(password)
+
+def legacy_hash_password(password: str) -> str:
+    """Hash password using the old SHA-256 with static salt scheme"""
+    h = hashlib.sha256(password.encode())
+    h.update(LEGACY_SALT)  # The salt is a suffix, so feed it after the password
+    return h.hexdigest()
+
+def verify_password(password: str, stored_hash: str):
+    """Verify a password, returning (is_valid, new_hash) where new_hash is set if the hash should be upgraded"""
+    if pwd_context.identify(stored_hash, required=False) is None:
+        # Legacy SHA-256 hex digest, rehash with bcrypt on successful verify
+        if not hmac.compare_digest(legacy_hash_password(password), stored_hash):
+            return False, None
+        return True, hash_password(password)
+    return pwd_context.verify_and_update(password, stored_hash)
+
+def verify_dummy_password(password: str):
+    """Spend the same bcrypt work as a real verify, so unknown usernames aren't revealed by timing"""
+    pwd_context.verify(password, DUMMY_PASSWORD_HASH)
+
+def update_password_hash(username: str, new_hash: str):
+    """Replace a user's stored password hash"""
+    with _users_write_lock:
+        users = dict(load_users())
+        users[username] = {**users[username], "password_hash": new_hash}
+        save_users(users)
+    logger.info(f"Password hash upgraded for user {username}")
+
+def _auth_cache_key(username: str, password: str):
+    """Build an auth cache key without keeping the plaintext password"""
+    return (username, hashlib.sha256(password.encode()).digest())
+
+def clear_auth_cache():
+    """Drop all cached authentications, e.g. after user data changes"""
+    with _auth_cache_lock:
+        _auth_cache.clear()
+
+def _file_stamp(path: str):
+    """Return (mtime_ns, size) for a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
 
 def load_users():
-    """Load users from JSON file with proper error handling"""
+    """Load users from JSON file, reusing the cached copy while the file is unchanged"""
     try:
-        if os.path.exists(USERS_FILE):
-            with open(USERS_FILE, "r") as f:
-                data = json.load(f)
-                return data if isinstance(data, dict) else {}
-        return {}
-    except (json.JSONDecodeError, IOError) as e:
+        with _users_cache_lock:
+            stamp = _file_stamp(USERS_FILE)
+            if stamp is None:
+                return {}
+            if stamp == _users_cache["stamp"]:
+                return _users_cache["data"]
+            with open(USERS_FILE, "rb") as f:
+                data = orjson.loads(f.read())
+            _users_cache["data"] = data if isinstance(data, dict) else {}
+            _users_cache["stamp"] = stamp
+            clear_auth_cache()
+            return _users_cache["data"]
+    except (orjson.JSONDecodeError, IOError) as e:
         logger.error(f"Error loading users file: {e}")
         return {}
     except Exception as e:
@@ -37,8 +116,15 @@ def load_users():
 def save_users(users_dict):
     """Save users to JSON file with proper error handling"""
     try:
-        with open(USERS_FILE, "w") as f:
-            json.dump(users_dict, f, indent=2)
+        with _users_cache_lock:
+            # Write to a temp file and swap it in, so a failed write never truncates users.json
+            tmp_file = USERS_FILE + ".tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(orjson.dumps(users_dict))
+            os.replace(tmp_file, USERS_FILE)
+            _users_cache["data"] = users_dict
+            _users_cache["stamp"] = _file_stamp(USERS_FILE)
+            clear_auth_cache()
     except IOError as e:
         logger.error(f"Error saving users file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save user data")
@@ -46,11 +132,44 @@ def save_users(users_dict):
         logger.error(f"Unexpected error saving users file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save user data")
 
+def get_user_model(users, username: str) -> Optional[User]:
+    """Return the User for username in users, or None if there is no such user"""
+    with _users_cache_lock:
+        cached = _users_cache["models"]
+        if cached is not None and cached[0] is users and username in cached[1]:
+            return cached[1][username]
+    
+    user_data = users.get(username)
+    if user_data is None:
+        return None
+    # Built per user, so one malformed record only affects that user
+    user = User(
+        username=username,
+        password_hash=user_data["password_hash"],
+        role=UserRole(user_data["role"]),
+        email=user_data.get("email")
+    )
+    with _users_cache_lock:
+        if _users_cache["data"] is users:
+            cached = _users_cache["models"]
+            if cached is None or cached[0] is not users:
+                cached = (users, {})
+                _users_cache["models"] = cached
+            cached[1][username] = user
+    return user
+
 def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)) -> User:
     """Authenticate user using HTTP Basic Auth"""
-    users = load_users()
+    users = load_users()  # Reloads (and clears the auth cache) if users.json changed
+    
+    cache_key = _auth_cache_key(credentials.username, credentials.password)
+    with _auth_cache_lock:
+        cached_user = _auth_cache.get(cache_key)
+    if cached_user is not None:
+        return cached_user
     
     if credentials.username not in users:
+        verify_dummy_password(credentials.password)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -59,21 +178,23 @@ def authenticate_user(credentials: HTTPBasicCredentials = Depends(security)) ->
 
     user_data = users[credentials.username]
     stored_hash = user_data["password_hash"]
-    input_hash = hash_password(credentials.password)
+    is_valid, new_hash = verify_password(credentials.password, stored_hash)
 
-    if input_hash != stored_hash:
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Basic"}
         )
     
-    return User(
-        username=credentials.username,
-        password_hash=stored_hash,
-        role=UserRole(user_data["role"]),
-        email=user_data.get("email")
-    )
+    if new_hash:
+        update_password_hash(credentials.username, new_hash)
+        users = load_users()
+    
+    user = get_user_model(users, credentials.username)
+    with _auth_cache_lock:
+        _auth_cache[cache_key] = user
+    return user
 
 def get_current_user(user: User = Depends(authenticate_user)) -> User:
     """Get current authenticated user"""
@@ -94,7 +215,7 @@ def require_authenticated_user(user: User = Depends(get_current_user)) -> User:
 
 def create_default_admin():
     """Create default admin user if no users exist"""
-    users = load_users()
+    users = dict(load_users())  # Copy so the cached dict is only replaced once saved
     
     if not users:
         admin_user = {
@@ -108,9 +229,7 @@ def create_default_admin():
 
 def register_user(username: str, password: str, role: UserRole = UserRole.CUSTOMER, email: str = None):
     """Register a new user"""
-    users = load_users()
-    
-    if username in users:
+    if username in load_users():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already exists"
@@ -130,15 +249,21 @@ def register_user(username: str, password: str, role: UserRole = UserRole.CUSTOM
             detail="Password must be at least 6 characters long"
         )
     
-    # Hash password and create user
+    # Hash password outside the write lock, then create user
     hashed_password = hash_password(password)
-    users[username] = {
-        "password_hash": hashed_password,
-        "role": role.value,
-        "email": email
-    }
-    
-    save_users(users)
+    with _users_write_lock:
+        users = dict(load_users())  # Copy so the cached dict is only replaced once saved
+        if username in users:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already exists"
+            )
+        users[username] = {
+            "password_hash": hashed_password,
+            "role": role.value,
+            "email": email
+        }
+        save_users(users)
     logger.info(f"User {username} registered successfully with role {role.value}")
     
     return {
@@ -1,16 +1,21 @@
-from fastapi import FastAPI, HTTPException, status, Depends
+from fastapi import FastAPI, HTTPException, status, Depends, Response
 from models import (
     UserRegistration, LoginRequest, LoginResponse, ProductCreate, Product,
-    CartAddRequest, CartResponse, ProductResponse, User, UserRole
+    CartAddRequest, CartResponse, ProductResponse, User
 )
 from auth import (
     authenticate_user, get_current_user, require_admin, require_authenticated_user,
-    create_default_admin, register_user, hash_password, load_users
+    create_default_admin, register_user, verify_password, verify_dummy_password,
+    update_password_hash, load_users, get_user_model
 )
-import json
+import orjson
 import os
 import logging
-from typing import List
+import asyncio
+import threading
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
 
 app = FastAPI(
     title="Shopping Cart API",
@@ -25,22 +30,131 @@ logger = logging.getLogger(__name__)
 PRODUCTS_FILE = "products.json"
 CART_FILE = "cart.json"
 
+# Parsed products and cart files, reused until the file's mtime/size change on disk.
+# "dirty" is set while saved data is still waiting to be written to disk.
+# "by_id", "names", "models" and "json" hold (products list, index) pairs built on first use; an index
+# is only valid while its products list is still the cached "data".
+_products_cache = {
+    "stamp": None, "data": [], "dirty": False,
+    "by_id": None, "names": None, "models": None, "json": None
+}
+_products_cache_lock = threading.Lock()
+
+# Next product ID to hand out, seeded from the products file and reset whenever it's reloaded
+_next_product_id: Optional[int] = None
+# "responses" maps usernames to (cart items list, encoded /cart/ response), reused while that
+# user's items list is unchanged; carts are always replaced on update, never mutated in place.
+_cart_cache = {"stamp": None, "data": {}, "dirty": False, "responses": {}}
+_cart_cache_lock = threading.Lock()
+_CACHES = {
+    PRODUCTS_FILE: (_products_cache, _products_cache_lock),
+    CART_FILE: (_cart_cache, _cart_cache_lock),
+}
+
+# Saved snapshots are written to disk by a background task; bursts collapse into one write per file
+WRITE_DELAY_SECONDS = 0.05  # How long the writer waits for more snapshots before writing
+_STOP = object()  # Queue marker: flush pending writes and stop the writer
+_write_queue: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
+_writer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _file_stamp(path: str):
+    """Return (mtime_ns, size) for a file, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 # Initialize default admin on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize default admin user and sample data"""
-    create_default_admin()
-    initialize_sample_products()
+    """Start the data writer, initialize default admin user and sample data, and warm the caches"""
+    global _write_queue, _writer_task, _writer_loop
+    _writer_loop = asyncio.get_running_loop()
+    _write_queue = asyncio.Queue()
+    _writer_task = asyncio.create_task(_data_writer())
+    await run_in_threadpool(create_default_admin)
+    await run_in_threadpool(initialize_sample_products)
+    await run_in_threadpool(load_cart)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending product and cart writes before exiting"""
+    global _writer_task
+    if _writer_task is not None:
+        _write_queue.put_nowait(_STOP)
+        await _writer_task
+        _writer_task = None
+
+def write_data_file(path: str, data):
+    """Atomically replace a products or cart file with the given data"""
+    cache, lock = _CACHES[path]
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(orjson.dumps(data))
+    os.replace(tmp_file, path)
+    with lock:
+        cache["stamp"] = _file_stamp(path)
+        if cache["data"] is data:
+            cache["dirty"] = False
+
+async def _data_writer():
+    """Background task that writes the latest queued snapshot of each file to disk"""
+    stopping = False
+    while not stopping:
+        items = [await _write_queue.get()]
+        if items[0] is not _STOP:
+            await asyncio.sleep(WRITE_DELAY_SECONDS)
+        while not _write_queue.empty():
+            items.append(_write_queue.get_nowait())
+        
+        stopping = any(item is _STOP for item in items)
+        # Only the newest snapshot of each file matters, older ones are superseded
+        latest = {}
+        for item in items:
+            if item is not _STOP:
+                path, data = item
+                latest[path] = data
+        for path, data in latest.items():
+            try:
+                await run_in_threadpool(write_data_file, path, data)
+            except Exception as e:
+                logger.error(f"Error saving {path}: {e}")
+
+def save_data_file(path: str, data):
+    """Save data in memory and queue it for writing, or write directly if the writer isn't running"""
+    cache, lock = _CACHES[path]
+    with lock:
+        cache["data"] = data
+        cache["dirty"] = True
+    if _writer_task is not None:
+        # Thread-safe hand-off, since saves may also come from threadpool workers
+        _writer_loop.call_soon_threadsafe(_write_queue.put_nowait, (path, data))
+    else:
+        write_data_file(path, data)
 
+# Loaders are called directly from async handlers: once the cache is warm, a call is one
+# os.stat, cheaper than a threadpool hop. Files are only parsed again if edited outside the app.
 def load_products():
-    """Load products from JSON file with proper error handling"""
+    """Load products from JSON file, reusing the cached copy while the file is unchanged"""
+    global _next_product_id
     try:
-        if os.path.exists(PRODUCTS_FILE):
-            with open(PRODUCTS_FILE, "r") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        return []
-    except (json.JSONDecodeError, IOError) as e:
+        with _products_cache_lock:
+            if _products_cache["dirty"]:
+                return _products_cache["data"]  # Unwritten changes are newer than the file
+            stamp = _file_stamp(PRODUCTS_FILE)
+            if stamp is None:
+                return []
+            if stamp == _products_cache["stamp"]:
+                return _products_cache["data"]
+            with open(PRODUCTS_FILE, "rb") as f:
+                data = orjson.loads(f.read())
+            _products_cache["data"] = data if isinstance(data, list) else []
+            _products_cache["stamp"] = stamp
+            _next_product_id = None
+            return _products_cache["data"]
+    except (orjson.JSONDecodeError, IOError) as e:
         logger.error(f"Error loading products file: {e}")
         return []
     except Exception as e:
@@ -50,8 +164,7 @@ def load_products():
 def save_products(products_list):
     """Save products to JSON file with proper error handling"""
     try:
-        with open(PRODUCTS_FILE, "w") as f:
-            json.dump(products_list, f, indent=2)
+        save_data_file(PRODUCTS_FILE, products_list)
     except IOError as e:
         logger.error(f"Error saving products file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save product data")
@@ -60,14 +173,23 @@ def save_products(products_list):
         raise HTTPException(status_code=500, detail="Failed to save product data")
 
 def load_cart():
-    """Load cart data from JSON file with proper error handling"""
+    """Load cart data from JSON file, reusing the cached copy while the file is unchanged"""
     try:
-        if os.path.exists(CART_FILE):
-            with open(CART_FILE, "r") as f:
-                data = json.load(f)
-                return data if isinstance(data, dict) else {}
-        return {}
-    except (json.JSONDecodeError, IOError) as e:
+        with _cart_cache_lock:
+            if _cart_cache["dirty"]:
+                return _cart_cache["data"]  # Unwritten changes are newer than the file
+            stamp = _file_stamp(CART_FILE)
+            if stamp is None:
+                return {}
+            if stamp == _cart_cache["stamp"]:
+                return _cart_cache["data"]
+            with open(CART_FILE, "rb") as f:
+                data = orjson.loads(f.read())
+            _cart_cache["data"] = data if isinstance(data, dict) else {}
+            _cart_cache["stamp"] = stamp
+            _cart_cache["responses"] = {}
+            return _cart_cache["data"]
+    except (orjson.JSONDecodeError, IOError) as e:
         logger.error(f"Error loading cart file: {e}")
         return {}
     except Exception as e:
@@ -77,8 +199,7 @@ def load_cart():
 def save_cart(cart_dict):
     """Save cart data to JSON file with proper error handling"""
     try:
-        with open(CART_FILE, "w") as f:
-            json.dump(cart_dict, f, indent=2)
+        save_data_file(CART_FILE, cart_dict)
     except IOError as e:
         logger.error(f"Error saving cart file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save cart data")
@@ -87,19 +208,98 @@ def save_cart(cart_dict):
         raise HTTPException(status_code=500, detail="Failed to save cart data")
 
 def get_next_product_id():
-    """Get the next available product ID"""
+    """Reserve the next available product ID"""
+    global _next_product_id
     products = load_products()
-    if not products:
-        return 1
-    return max(product["id"] for product in products) + 1
+    with _products_cache_lock:
+        if _next_product_id is None:
+            _next_product_id = max((product["id"] for product in products), default=0) + 1
+        new_id = _next_product_id
+        _next_product_id += 1
+    return new_id
+
+def _get_products_index(products, key: str, build):
+    """Return build(products), computed once per cached products list and stored under key"""
+    with _products_cache_lock:
+        cached = _products_cache[key]
+        if cached is not None and cached[0] is products:
+            return cached[1]
+    index = build(products)
+    _store_products_index(products, key, index)
+    return index
+
+def _store_products_index(products, key: str, index):
+    """Cache index under key, if products is still the cached products list"""
+    with _products_cache_lock:
+        if _products_cache["data"] is products:
+            _products_cache[key] = (products, index)
+
+def _build_by_id(products):
+    """Map each product ID to its product"""
+    return {product["id"]: product for product in products}
+
+def _build_names(products):
+    """Collect lowercased product names for case-insensitive duplicate checks"""
+    return {product["name"].lower() for product in products}
+
+# Validates a whole products list in one call instead of building each Product separately
+_PRODUCT_LIST_ADAPTER = TypeAdapter(List[Product])
+
+def get_products_by_id(products):
+    """Return {product_id: product} for products"""
+    return _get_products_index(products, "by_id", _build_by_id)
+
+def get_product_names(products):
+    """Return the set of lowercased product names in products"""
+    return _get_products_index(products, "names", _build_names)
+
+def get_product_models(products):
+    """Return products validated as Product models"""
+    return _get_products_index(products, "models", _PRODUCT_LIST_ADAPTER.validate_python)
+
+def _build_products_json(products):
+    """Encode the /products/ response body"""
+    return ProductResponse(
+        products=get_product_models(products),
+        total_products=len(products)
+    ).model_dump_json().encode()
+
+def get_products_json(products):
+    """Return the encoded /products/ response for products"""
+    return _get_products_index(products, "json", _build_products_json)
 
 def find_product_by_id(product_id: int):
     """Find a product by its ID"""
-    products = load_products()
-    for product in products:
-        if product["id"] == product_id:
-            return product
-    return None
+    return get_products_by_id(load_products()).get(product_id)
+
+def get_cart_totals(user_cart):
+    """Return (total_items, total_price) for a user's cart items"""
+    # Totals in a single pass over the cart
+    total_items = 0
+    total_price = 0.0
+    for item in user_cart:
+        quantity = item["quantity"]
+        total_items += quantity
+        total_price += item["price"] * quantity
+    return total_items, total_price
+
+def get_cart_json(username: str, user_cart):
+    """Return the encoded /cart/ response for a user's cart items, built once per items list"""
+    with _cart_cache_lock:
+        cached = _cart_cache["responses"].get(username)
+    if cached is not None and cached[0] is user_cart:
+        return cached[1]
+    
+    total_items, total_price = get_cart_totals(user_cart)
+    content = CartResponse(
+        username=username,
+        items=user_cart,
+        total_items=total_items,
+        total_price=round(total_price, 2)
+    ).model_dump_json().encode()
+    with _cart_cache_lock:
+        _cart_cache["responses"][username] = (user_cart, content)
+    return content
 
 def initialize_sample_products():
     """Initialize sample products if none exist"""
@@ -159,7 +359,9 @@ async def root():
 async def register(user_data: UserRegistration):
     """Register a new user"""
     try:
-        result = register_user(
+        # bcrypt releases the GIL, so concurrent registrations hash in parallel
+        result = await run_in_threadpool(
+            register_user,
             username=user_data.username,
             password=user_data.password,
             role=user_data.role,
@@ -180,31 +382,34 @@ async def login(login_data: LoginRequest):
     """Authenticate user credentials"""
     try:
         users = load_users()
+        user = get_user_model(users, login_data.username)
         
-        if login_data.username not in users:
+        if user is None:
+            await run_in_threadpool(verify_dummy_password, login_data.password)
             logger.warning(f"Login attempt with non-existent username: {login_data.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid username or password"
             )
         
-        user_data = users[login_data.username]
-        stored_hash = user_data["password_hash"]
-        input_hash = hash_password(login_data.password)
+        is_valid, new_hash = await run_in_threadpool(verify_password, login_data.password, user.password_hash)
         
-        if input_hash != stored_hash:
+        if not is_valid:
             logger.warning(f"Failed login attempt for user: {login_data.username}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid username or password"
             )
         
+        if new_hash:
+            await run_in_threadpool(update_password_hash, login_data.username, new_hash)
+        
         logger.info(f"User {login_data.username} logged in successfully")
         
         return LoginResponse(
             message="Login successful",
-            username=login_data.username,
-            role=UserRole(user_data["role"])
+            username=user.username,
+            role=user.role
         )
     
     except HTTPException:
@@ -220,15 +425,18 @@ async def login(login_data: LoginRequest):
 async def add_product(product_data: ProductCreate, admin_user: User = Depends(require_admin)):
     """Add a new product (admin only)"""
     try:
-        products = load_products()
+        cached_products = load_products()
         
         # Check if product with same name already exists
-        for product in products:
-            if product["name"].lower() == product_data.name.lower():
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Product with this name already exists"
-                )
+        name_key = product_data.name.lower()
+        names = get_product_names(cached_products)
+        if name_key in names:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Product with this name already exists"
+            )
+        
+        products = list(cached_products)  # Copy so the cached list is only replaced once saved
         
         # Create new product
         new_product = {
@@ -241,7 +449,13 @@ async def add_product(product_data: ProductCreate, admin_user: User = Depends(re
         }
         
         products.append(new_product)
+        # Extend the existing indexes rather than rebuilding them from the new list
+        by_id = dict(get_products_by_id(cached_products))
+        by_id[new_product["id"]] = new_product
+        names = names | {name_key}
         save_products(products)
+        _store_products_index(products, "by_id", by_id)
+        _store_products_index(products, "names", names)
         
         logger.info(f"Product '{product_data.name}' added by admin {admin_user.username}")
         
@@ -265,10 +479,8 @@ async def get_products():
     try:
         products = load_products()
         
-        return ProductResponse(
-            products=[Product(**product) for product in products],
-            total_products=len(products)
-        )
+        # Served pre-encoded; the body is only rebuilt when the products list changes
+        return Response(content=get_products_json(products), media_type="application/json")
     
     except Exception as e:
         logger.error(f"Error retrieving products: {e}")
@@ -296,18 +508,16 @@ async def add_to_cart(cart_item: CartAddRequest, user: User = Depends(require_au
                 detail=f"Insufficient stock. Available: {product['stock']}"
             )
         
-        # Load cart data
-        cart_data = load_cart()
-        
-        # Initialize user cart if it doesn't exist
-        if user.username not in cart_data:
-            cart_data[user.username] = []
+        # Load cart data (copied so the cache is only replaced once saved)
+        cart_data = dict(load_cart())
         
-        user_cart = cart_data[user.username]
+        # Copy the user's cart, initializing it if it doesn't exist
+        user_cart = list(cart_data.get(user.username, []))
+        cart_data[user.username] = user_cart
         
         # Check if item already in cart
         item_found = False
-        for item in user_cart:
+        for i, item in enumerate(user_cart):
             if item["product_id"] == cart_item.product_id:
                 # Update quantity
                 new_quantity = item["quantity"] + cart_item.quantity
@@ -316,7 +526,7 @@ async def add_to_cart(cart_item: CartAddRequest, user: User = Depends(require_au
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail=f"Insufficient stock. Available: {product['stock']}, requested total: {new_quantity}"
                     )
-                item["quantity"] = new_quantity
+                user_cart[i] = {**item, "quantity": new_quantity}
                 item_found = True
                 break
         
@@ -356,15 +566,8 @@ async def get_cart(user: User = Depends(require_authenticated_user)):
         cart_data = load_cart()
         user_cart = cart_data.get(user.username, [])
         
-        total_items = sum(item["quantity"] for item in user_cart)
-        total_price = sum(item["price"] * item["quantity"] for item in user_cart)
-        
-        return CartResponse(
-            username=user.username,
-            items=user_cart,
-            total_items=total_items,
-            total_price=round(total_price, 2)
-        )
+        # Served pre-encoded; the body is only rebuilt when this user's cart changes
+        return Response(content=get_cart_json(user.username, user_cart), media_type="application/json")
     
     except Exception as e:
         logger.error(f"Error retrieving cart for {user.username}: {e}")
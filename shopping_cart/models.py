@@ -1,7 +1,33 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from enum import Enum
 
+# Example payloads shown in the OpenAPI docs
+USER_REGISTRATION_EXAMPLE = {
+    "username": "john_doe",
+    "password": "secure123",
+    "role": "customer",
+    "email": "john@example.com"
+}
+
+LOGIN_REQUEST_EXAMPLE = {
+    "username": "john_doe",
+    "password": "secure123"
+}
+
+PRODUCT_CREATE_EXAMPLE = {
+    "name": "Laptop",
+    "description": "High-performance laptop for work and gaming",
+    "price": 999.99,
+    "stock": 10,
+    "category": "Electronics"
+}
+
+CART_ADD_REQUEST_EXAMPLE = {
+    "product_id": 1,
+    "quantity": 2
+}
+
 class UserRole(str, Enum):
     """User roles enumeration"""
     ADMIN = "admin"
@@ -21,28 +47,14 @@ class UserRegistration(BaseModel):
     role: UserRole = Field(default=UserRole.CUSTOMER, description="User role")
     email: Optional[str] = Field(None, description="User email")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "password": "secure123",
-                "role": "customer",
-                "email": "john@example.com"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": USER_REGISTRATION_EXAMPLE})
 
 class LoginRequest(BaseModel):
     """Model for login request"""
     username: str = Field(..., description="Username")
     password: str = Field(..., description="Password")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "password": "secure123"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": LOGIN_REQUEST_EXAMPLE})
 
 class LoginResponse(BaseModel):
     """Model for login response"""
@@ -67,16 +79,7 @@ class ProductCreate(BaseModel):
     stock: int = Field(..., ge=0, description="Stock quantity")
     category: str = Field(..., min_length=1, max_length=50, description="Product category")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "name": "Laptop",
-                "description": "High-performance laptop for work and gaming",
-                "price": 999.99,
-                "stock": 10,
-                "category": "Electronics"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": PRODUCT_CREATE_EXAMPLE})
 
 class CartItem(BaseModel):
     """Cart item model"""
@@ -88,18 +91,19 @@ class CartAddRequest(BaseModel):
     product_id: int = Field(..., description="Product ID")
     quantity: int = Field(..., gt=0, description="Quantity to add")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "product_id": 1,
-                "quantity": 2
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": CART_ADD_REQUEST_EXAMPLE})
+
+class CartItemView(BaseModel):
+    """Cart item as stored and returned in the cart"""
+    product_id: int
+    product_name: str
+    price: float
+    quantity: int
 
 class CartResponse(BaseModel):
     """Model for cart response"""
     username: str
-    items: List[dict]
+    items: List[CartItemView]
     total_items: int
     total_price: float
 